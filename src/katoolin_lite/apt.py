@@ -1,23 +1,37 @@
 """Abstractions for interacting with apt safely."""
 from __future__ import annotations
 
+import functools
 import os
+import re
+import shlex
+import shutil
 import subprocess
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 APT_SOURCES_DIR = Path("/etc/apt/sources.list.d")
 KALI_SOURCE_FILE = APT_SOURCES_DIR / "katoolin-kali.list"
 KALI_SOURCE_SNIPPET = "deb http://http.kali.org/kali kali-rolling main contrib non-free non-free-firmware\n"
+APT_ARCHIVES_DIR = Path("/var/cache/apt/archives")
+
+# One line of ``apt-get --print-uris`` output: 'URI' filename size checksum
+_PRINT_URIS_RE = re.compile(r"^'(?P<uri>[^']+)' (?P<filename>\S+) \d+ (?P<algo>\w+):(?P<digest>\S+)$", re.MULTILINE)
+_ARIA2_CHECKSUMS = {"SHA512": "sha-512", "SHA256": "sha-256", "SHA1": "sha-1", "MD5Sum": "md5"}
 
 
 class AptError(RuntimeError):
     """Raised when apt operations fail."""
 
 
-@dataclass
-class AptCommandResult:
+@functools.lru_cache(maxsize=None)
+def _which(name: str) -> str:
+    """Return the absolute path of *name* on PATH, falling back to the bare name."""
+
+    return shutil.which(name) or name
+
+
+class AptCommandResult(NamedTuple):
     """Represents the result of a command execution."""
 
     command: List[str]
@@ -35,32 +49,187 @@ class AptRunner:
 
     def __init__(self, dry_run: bool = False) -> None:
         self.dry_run = dry_run
+        # apt-get is invoked directly when already root; sudo only adds a fork/exec.
+        self._sudo_prefix: List[str] = [] if _IS_ROOT else [_which("sudo")]
+        self._apt_get = _which("apt-get")
+        self._pending_install: List[str] = []
+        self._pending_upgrade: List[str] = []
+
+    def run(self, command: Iterable[str], check: bool = True, capture: bool = True) -> AptCommandResult:
+        """Execute *command*, or return a successful result without running it in dry-run mode.
+
+        With ``capture=False`` stdout is discarded and only stderr is kept for
+        error reporting.
+        """
 
-    def run(self, command: Iterable[str], check: bool = True) -> AptCommandResult:
         cmd = list(command)
         if self.dry_run:
             return AptCommandResult(cmd, 0, "", "")
+        # subprocess.run() drains stdout and stderr together via communicate(), so
+        # large apt output cannot fill one pipe while we block on the other.
+        # Absolute executables plus close_fds=False (safe since PEP 446 made fds
+        # non-inheritable) keep CPython on its posix_spawn fast path; do not add
+        # preexec_fn, cwd or shell=True here.
         completed = subprocess.run(
             cmd,
-            stdout=subprocess.PIPE,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
             stderr=subprocess.PIPE,
             text=True,
+            close_fds=False,
             check=False,
         )
-        if check and completed.returncode != 0:
-            raise AptError(f"Command {' '.join(cmd)} failed: {completed.stderr.strip()}")
-        return AptCommandResult(cmd, completed.returncode, completed.stdout, completed.stderr)
+        return self._finish(cmd, completed.returncode, completed.stdout or "", completed.stderr, check)
+
+    async def run_async(self, command: Iterable[str], check: bool = True, capture: bool = True) -> AptCommandResult:
+        """Asynchronous counterpart of :meth:`run`.
+
+        stdout and stderr are drained concurrently by ``communicate()``.
+        """
+
+        import asyncio
+
+        cmd = list(command)
+        if self.dry_run:
+            return AptCommandResult(cmd, 0, "", "")
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            close_fds=False,
+        )
+        stdout, stderr = await proc.communicate()
+        return self._finish(
+            cmd,
+            proc.returncode,
+            (stdout or b"").decode(errors="replace"),
+            stderr.decode(errors="replace"),
+            check,
+        )
+
+    def run_many(
+        self, commands: Iterable[Iterable[str]], check: bool = True, capture: bool = True
+    ) -> List[AptCommandResult]:
+        """Run independent *commands* concurrently and return results in order."""
+
+        import asyncio
+
+        async def gather_results() -> List[AptCommandResult]:
+            runs = (self.run_async(cmd, check=check, capture=capture) for cmd in commands)
+            return list(await asyncio.gather(*runs))
+
+        return asyncio.run(gather_results())
+
+    @staticmethod
+    def _finish(cmd: List[str], returncode: int, stdout: str, stderr: str, check: bool) -> AptCommandResult:
+        if check and returncode != 0:
+            raise AptError(f"Command {shlex.join(cmd)} failed: {stderr.strip()}")
+        return AptCommandResult(cmd, returncode, stdout, stderr)
 
     # Convenience wrappers -------------------------------------------------
 
+    def apt_command(self, *args: str) -> List[str]:
+        """Return an apt-get command line, prefixed with sudo when not root."""
+
+        return [*self._sudo_prefix, self._apt_get, *args]
+
     def ensure_updated(self) -> AptCommandResult:
-        return self.run(["sudo", "apt-get", "update"])
+        return self.run(self.apt_command("update"), capture=False)
 
-    def install_packages(self, packages: Iterable[str]) -> AptCommandResult:
-        return self.run(["sudo", "apt-get", "install", "-y", *packages])
+    def install_packages(self, packages: Iterable[str], parallel_download: bool = False) -> AptCommandResult:
+        return self._install(["install", "-y", *packages], parallel_download)
 
-    def upgrade_packages(self, packages: Iterable[str]) -> AptCommandResult:
-        return self.run(["sudo", "apt-get", "install", "--only-upgrade", "-y", *packages])
+    def upgrade_packages(self, packages: Iterable[str], parallel_download: bool = False) -> AptCommandResult:
+        return self._install(["install", "--only-upgrade", "-y", *packages], parallel_download)
+
+    def _install(self, args: List[str], parallel_download: bool) -> AptCommandResult:
+        if parallel_download:
+            self.prefetch(args)
+        result = self.run(self.apt_command(*args), capture=False)
+        # Installed versions may have changed; drop memoised lookups.
+        get_installed_version.cache_clear()
+        return result
+
+    def prefetch(self, install_args: Iterable[str]) -> bool:
+        """Download the archives an apt-get install would fetch using aria2c.
+
+        The files land in apt's cache so the following install skips the
+        serial download. Returns False when aria2c is unavailable or nothing
+        needed fetching; apt then downloads as usual.
+        """
+
+        aria2c = shutil.which("aria2c")
+        if self.dry_run or aria2c is None:
+            return False
+        listing = self.run(self.apt_command(*install_args, "--print-uris"), check=False)
+        matches = list(_PRINT_URIS_RE.finditer(listing.stdout))
+        if not matches:
+            return False
+
+        import tempfile
+
+        with tempfile.NamedTemporaryFile("w", suffix=".aria2", delete=False, encoding="utf-8") as handle:
+            for match in matches:
+                handle.write(f"{match['uri']}\n  out={match['filename']}\n")
+                algo = _ARIA2_CHECKSUMS.get(match["algo"])
+                if algo:
+                    handle.write(f"  checksum={algo}={match['digest']}\n")
+        try:
+            result = self.run(
+                [
+                    *self._sudo_prefix,
+                    aria2c,
+                    "--max-connection-per-server=16",
+                    "--max-concurrent-downloads=16",
+                    "--auto-file-renaming=false",
+                    "--console-log-level=warn",
+                    f"--dir={APT_ARCHIVES_DIR}",
+                    f"--input-file={handle.name}",
+                ],
+                check=False,
+                capture=False,
+            )
+        finally:
+            os.unlink(handle.name)
+        return result.succeeded
+
+    # Batching -------------------------------------------------------------
+
+    def install_many(
+        self, packages: Iterable[str], upgrade: bool = False, parallel_download: bool = False
+    ) -> Optional[AptCommandResult]:
+        """Install (or upgrade) the union of *packages* with a single apt invocation.
+
+        Returns None when there is nothing to do.
+        """
+
+        unique = sorted(set(packages))
+        if not unique:
+            return None
+        if upgrade:
+            return self.upgrade_packages(unique, parallel_download)
+        return self.install_packages(unique, parallel_download)
+
+    def queue_install(self, packages: Iterable[str]) -> None:
+        """Defer installing *packages* until :meth:`commit` is called."""
+
+        self._pending_install.extend(packages)
+
+    def queue_upgrade(self, packages: Iterable[str]) -> None:
+        """Defer upgrading *packages* until :meth:`commit` is called."""
+
+        self._pending_upgrade.extend(packages)
+
+    def commit(self) -> List[AptCommandResult]:
+        """Flush queued packages with at most one install and one upgrade call."""
+
+        install, self._pending_install = self._pending_install, []
+        upgrade, self._pending_upgrade = self._pending_upgrade, []
+        results = []
+        for packages, only_upgrade in ((install, False), (upgrade, True)):
+            result = self.install_many(packages, upgrade=only_upgrade)
+            if result is not None:
+                results.append(result)
+        return results
 
 
 class AptSourcesManager:
@@ -68,21 +237,52 @@ class AptSourcesManager:
 
     def __init__(self, runner: Optional[AptRunner] = None) -> None:
         self.runner = runner or AptRunner()
+        self._stat_cache: Optional[Tuple[int, str]] = None
+        self._sources_dir_ready = False
+
+    def _load_source(self) -> Optional[str]:
+        """Return the source file contents, or None if it does not exist.
+
+        Contents are cached and only re-read when the file's mtime changes.
+        Undecodable bytes are replaced, so a corrupt file reads as stale
+        rather than raising.
+        """
+
+        try:
+            mtime = os.stat(KALI_SOURCE_FILE).st_mtime_ns
+        except FileNotFoundError:
+            self._stat_cache = None
+            return None
+        if self._stat_cache is not None and self._stat_cache[0] == mtime:
+            return self._stat_cache[1]
+        contents = KALI_SOURCE_FILE.read_text(encoding="utf-8", errors="replace")
+        self._stat_cache = (mtime, contents)
+        return contents
 
     def source_exists(self) -> bool:
+        # Existence only needs a stat; contents are read lazily by read_source().
         return KALI_SOURCE_FILE.exists()
 
     def read_source(self) -> str:
-        if not self.source_exists():
-            return ""
-        return KALI_SOURCE_FILE.read_text(encoding="utf-8")
+        return self._load_source() or ""
 
     def enable_source(self, dry_run: Optional[bool] = None) -> None:
         dry = self.runner.dry_run if dry_run is None else dry_run
-        if dry:
+        if dry or self.read_source() == KALI_SOURCE_SNIPPET:
             return
-        APT_SOURCES_DIR.mkdir(parents=True, exist_ok=True)
-        KALI_SOURCE_FILE.write_text(KALI_SOURCE_SNIPPET, encoding="utf-8")
+        if not self._sources_dir_ready:
+            if not APT_SOURCES_DIR.is_dir():
+                APT_SOURCES_DIR.mkdir(parents=True, exist_ok=True)
+            self._sources_dir_ready = True
+        # Write beside the target and rename so apt never sees a partial file.
+        tmp_file = KALI_SOURCE_FILE.with_suffix(".list.tmp")
+        try:
+            tmp_file.write_text(KALI_SOURCE_SNIPPET, encoding="utf-8")
+            os.replace(tmp_file, KALI_SOURCE_FILE)
+        except OSError:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        self._stat_cache = None
 
     def disable_source(self, dry_run: Optional[bool] = None) -> None:
         dry = self.runner.dry_run if dry_run is None else dry_run
@@ -90,44 +290,79 @@ class AptSourcesManager:
             return
         if self.source_exists():
             KALI_SOURCE_FILE.unlink()
+            self._stat_cache = None
 
     def ensure_source(self, enable: bool) -> bool:
         """Ensure the Kali source file matches the *enable* flag.
 
+        A source file with stale contents is rewritten when enabling.
         Returns True if a change was required.
         """
 
-        currently_enabled = self.source_exists()
-        if enable and not currently_enabled:
+        if enable:
+            if self.read_source() == KALI_SOURCE_SNIPPET:
+                return False
             self.enable_source()
             return True
-        if not enable and currently_enabled:
+        if self.source_exists():
             self.disable_source()
             return True
         return False
 
 
-def get_installed_version(package: str) -> Optional[str]:
-    """Return the installed version string for *package*, if any."""
+def get_installed_versions(packages: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Return installed versions for *packages* using a single dpkg-query call.
+
+    Packages that are not installed map to None.
+    """
 
+    versions: Dict[str, Optional[str]] = dict.fromkeys(packages)
+    if not versions:
+        # dpkg-query without package arguments would list the whole database.
+        return versions
     try:
         result = subprocess.run(
-            ["dpkg-query", "-W", "-f=${Version}", package],
+            [_which("dpkg-query"), "-W", "-f=${Package}\t${Version}\n", *versions],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
+            close_fds=False,
             check=False,
         )
     except FileNotFoundError as exc:  # pragma: no cover - dpkg-query unavailable
         raise AptError("dpkg-query command not found") from exc
 
-    if result.returncode != 0:
-        return None
-    return result.stdout.strip() or None
+    # dpkg-query exits non-zero when any package is unknown but still reports the others.
+    for line in result.stdout.splitlines():
+        name, _, version = line.partition("\t")
+        if name in versions:
+            versions[name] = version.strip() or None
+    return versions
+
+
+@functools.lru_cache(maxsize=None)
+def get_installed_version(package: str) -> Optional[str]:
+    """Return the installed version string for *package*, if any.
+
+    Results are memoised until apt installs or upgrades packages through
+    :class:`AptRunner`.
+    """
+
+    return get_installed_versions([package]).get(package)
+
+
+_IS_ROOT = os.geteuid() == 0
+
+
+def _refresh_root() -> None:
+    """Re-read the effective uid, e.g. after privileges change in tests."""
+
+    global _IS_ROOT
+    _IS_ROOT = os.geteuid() == 0
 
 
 def require_root() -> None:
     """Raise AptError if the current process lacks root privileges."""
 
-    if os.geteuid() != 0:
+    if not _IS_ROOT:
         raise AptError("This operation requires root privileges. Re-run with sudo.")
@@ -1,16 +1,24 @@
 """Catalog definitions for katoolin-lite."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List
+import functools
+import json
+import pkgutil
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
+# ``slots=True`` is only understood by dataclasses on Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **_SLOTS)
 class Tool:
     """Represents an installable tool entry."""
 
     name: str
-    packages: List[str]
+    packages: Tuple[str, ...]
     description: str
     auto_updates: bool = True
 
@@ -20,440 +28,122 @@ class Tool:
         return "auto" if self.auto_updates else "manual"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class Category:
     """Represents a tool category."""
 
     name: str
-    tools: List[Tool]
+    tools: Tuple[Tool, ...]
     description: str
+    packages: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    installable_packages: Tuple[str, ...] = field(init=False, repr=False, compare=False)
 
-    def tool_names(self) -> Iterable[str]:
-        return (tool.name for tool in self.tools)
+    def __post_init__(self) -> None:
+        # Unique packages across all tools, precomputed for batch installs.
+        # Slotted dataclasses cannot use cached_property, hence init=False fields.
+        packages = tuple(dict.fromkeys(pkg for tool in self.tools for pkg in tool.packages))
+        object.__setattr__(self, "packages", packages)
+        object.__setattr__(self, "installable_packages", tuple(sorted(packages)))
 
+    def tool_names(self) -> Tuple[str, ...]:
+        return tuple(tool.name for tool in self.tools)
 
-CATALOG: Dict[str, Category] = {
-    "recon": Category(
-        name="Reconnaissance",
-        description="Network and host discovery tooling.",
-        tools=[
-            Tool(
-                name="nmap",
-                packages=["nmap"],
-                description="Versatile network scanner",
-            ),
-            Tool(
-                name="masscan",
-                packages=["masscan"],
-                description="Mass IP port scanner",
-            ),
-            Tool(
-                name="dnsenum",
-                packages=["dnsenum"],
-                description="DNS enumeration utility",
-            ),
-            Tool(
-                name="amass",
-                packages=["amass"],
-                description="In-depth attack surface mapping suite",
-            ),
-            Tool(
-                name="theharvester",
-                packages=["theharvester"],
-                description="Search engine and OSINT harvester",
-            ),
-            Tool(
-                name="recon-ng",
-                packages=["recon-ng"],
-                description="Modular OSINT reconnaissance framework",
-            ),
-            Tool(
-                name="sublist3r",
-                packages=["python3-sublist3r"],
-                description="Fast subdomain enumeration tool",
-            ),
-            Tool(
-                name="dnsrecon",
-                packages=["dnsrecon"],
-                description="DNS reconnaissance utility with brute forcing",
-            ),
-            Tool(
-                name="arp-scan",
-                packages=["arp-scan"],
-                description="ARP discovery for local network reconnaissance",
-            ),
-            Tool(
-                name="nbtscan",
-                packages=["nbtscan"],
-                description="NetBIOS name network scanner",
-            ),
-            Tool(
-                name="ike-scan",
-                packages=["ike-scan"],
-                description="Discover and fingerprint IKE VPN services",
-            ),
-            Tool(
-                name="legion",
-                packages=["legion"],
-                description="GUI-driven network enumeration platform",
-            ),
-            Tool(
-                name="rustscan",
-                packages=["rustscan"],
-                description="Lightning-fast TCP port scanner",
-            ),
-        ],
-    ),
-    "web": Category(
-        name="Web",
-        description="Web vulnerability analysis and exploitation.",
-        tools=[
-            Tool(
-                name="nikto",
-                packages=["nikto"],
-                description="Web server scanner",
-            ),
-            Tool(
-                name="wfuzz",
-                packages=["wfuzz"],
-                description="Web application brute forcer",
-            ),
-            Tool(
-                name="burpsuite",
-                packages=["burpsuite"],
-                description="Integrated web security testing platform",
-                auto_updates=False,
-            ),
-            Tool(
-                name="gobuster",
-                packages=["gobuster"],
-                description="Directory and DNS brute forcing utility",
-            ),
-            Tool(
-                name="ffuf",
-                packages=["ffuf"],
-                description="Fast web fuzzer for content discovery",
-            ),
-            Tool(
-                name="dirsearch",
-                packages=["dirsearch"],
-                description="Command-line brute forcing of web paths",
-            ),
-            Tool(
-                name="owasp-zap",
-                packages=["owasp-zap"],
-                description="OWASP Zed Attack Proxy web scanner",
-                auto_updates=False,
-            ),
-            Tool(
-                name="whatweb",
-                packages=["whatweb"],
-                description="Next generation web scanner and fingerprinting",
-            ),
-            Tool(
-                name="wpscan",
-                packages=["wpscan"],
-                description="WordPress vulnerability scanner",
-                auto_updates=False,
-            ),
-            Tool(
-                name="skipfish",
-                packages=["skipfish"],
-                description="High-performance web application security scanner",
-            ),
-            Tool(
-                name="joomscan",
-                packages=["joomscan"],
-                description="Joomla vulnerability scanner",
-            ),
-            Tool(
-                name="xsser",
-                packages=["xsser"],
-                description="Automated XSS attack framework",
-            ),
-        ],
-    ),
-    "exploitation": Category(
-        name="Exploitation",
-        description="Exploitation frameworks and helpers.",
-        tools=[
-            Tool(
-                name="metasploit-framework",
-                packages=["metasploit-framework"],
-                description="Metasploit penetration testing framework",
-            ),
-            Tool(
-                name="sqlmap",
-                packages=["sqlmap"],
-                description="Automated SQL injection tool",
-            ),
-            Tool(
-                name="searchsploit",
-                packages=["exploitdb"],
-                description="Local exploit database copies",
-                auto_updates=False,
-            ),
-            Tool(
-                name="crackmapexec",
-                packages=["crackmapexec"],
-                description="Swiss army knife for pentesting networks",
-            ),
-            Tool(
-                name="impacket-scripts",
-                packages=["impacket-scripts"],
-                description="Collection of Python tools for network exploitation",
-            ),
-            Tool(
-                name="set",
-                packages=["set"],
-                description="Social-Engineer Toolkit for targeted attacks",
-                auto_updates=False,
-            ),
-            Tool(
-                name="evil-winrm",
-                packages=["evil-winrm"],
-                description="PowerShell remoting shell for Windows targets",
-            ),
-        ],
-    ),
-    "post": Category(
-        name="Post-Exploitation",
-        description="Privilege escalation and persistence utilities.",
-        tools=[
-            Tool(
-                name="beef-xss",
-                packages=["beef-xss"],
-                description="Browser exploitation framework",
-                auto_updates=False,
-            ),
-            Tool(
-                name="responder",
-                packages=["responder"],
-                description="LLMNR, NBT-NS and MDNS poisoning tool",
-            ),
-            Tool(
-                name="bloodhound",
-                packages=["bloodhound"],
-                description="Active Directory attack path visualiser",
-                auto_updates=False,
-            ),
-            Tool(
-                name="powershell-empire",
-                packages=["powershell-empire"],
-                description="Post-exploitation framework for PowerShell agents",
-                auto_updates=False,
-            ),
-            Tool(
-                name="winexe",
-                packages=["winexe"],
-                description="Remote command execution for Windows hosts",
-            ),
-        ],
-    ),
-    "wireless": Category(
-        name="Wireless",
-        description="Wireless auditing toolset.",
-        tools=[
-            Tool(
-                name="aircrack-ng",
-                packages=["aircrack-ng"],
-                description="Wi-Fi network cracking suite",
-            ),
-            Tool(
-                name="bettercap",
-                packages=["bettercap"],
-                description="Network capture and MITM framework",
-            ),
-            Tool(
-                name="kismet",
-                packages=["kismet"],
-                description="Wireless network detector, sniffer, and IDS",
-            ),
-            Tool(
-                name="reaver",
-                packages=["reaver"],
-                description="WPS brute force attack tool",
-            ),
-            Tool(
-                name="hcxdumptool",
-                packages=["hcxdumptool"],
-                description="Captures wireless traffic for hash cracking",
-            ),
-            Tool(
-                name="wifite",
-                packages=["wifite"],
-                description="Automated wireless attack toolkit",
-            ),
-            Tool(
-                name="mdk4",
-                packages=["mdk4"],
-                description="Wi-Fi network stress testing tool",
-            ),
-            Tool(
-                name="pixiewps",
-                packages=["pixiewps"],
-                description="Offline WPS PIN recovery tool",
-            ),
-            Tool(
-                name="cowpatty",
-                packages=["cowpatty"],
-                description="WPA-PSK dictionary attack utility",
-            ),
-            Tool(
-                name="asleap",
-                packages=["asleap"],
-                description="CISCO LEAP password cracking tool",
-            ),
-        ],
-    ),
-    "passwords": Category(
-        name="Password Attacks",
-        description="Wordlist generation and password cracking suites.",
-        tools=[
-            Tool(
-                name="hashcat",
-                packages=["hashcat"],
-                description="GPU-accelerated password cracker",
-            ),
-            Tool(
-                name="john",
-                packages=["john"],
-                description="John the Ripper password cracking framework",
-            ),
-            Tool(
-                name="hydra",
-                packages=["hydra"],
-                description="Parallelized login brute forcer",
-            ),
-            Tool(
-                name="cewl",
-                packages=["cewl"],
-                description="Custom wordlist generator from web content",
-            ),
-            Tool(
-                name="crunch",
-                packages=["crunch"],
-                description="Flexible wordlist generation utility",
-            ),
-            Tool(
-                name="medusa",
-                packages=["medusa"],
-                description="High-performance parallel login brute forcer",
-            ),
-            Tool(
-                name="patator",
-                packages=["patator"],
-                description="Modular brute-force utility supporting many protocols",
-            ),
-            Tool(
-                name="hashid",
-                packages=["hashid"],
-                description="Identify the type of hashed password strings",
-            ),
-            Tool(
-                name="pack",
-                packages=["pack"],
-                description="Password Analysis and Cracking Kit utilities",
-            ),
-        ],
-    ),
-    "forensics": Category(
-        name="Forensics",
-        description="File system, memory, and artifact analysis tools.",
-        tools=[
-            Tool(
-                name="autopsy",
-                packages=["autopsy"],
-                description="Digital forensics platform and graphical interface",
-                auto_updates=False,
-            ),
-            Tool(
-                name="sleuthkit",
-                packages=["sleuthkit"],
-                description="File system forensic analysis toolkit",
-            ),
-            Tool(
-                name="binwalk",
-                packages=["binwalk"],
-                description="Firmware analysis tool for binary images",
-            ),
-            Tool(
-                name="foremost",
-                packages=["foremost"],
-                description="File carving utility",
-            ),
-            Tool(
-                name="bulk-extractor",
-                packages=["bulk-extractor"],
-                description="Scans disk images, files, and directories for features",
-            ),
-            Tool(
-                name="volatility",
-                packages=["volatility"],
-                description="Advanced memory forensics framework",
-            ),
-            Tool(
-                name="plaso",
-                packages=["plaso"],
-                description="Log2Timeline plaso incident response toolkit",
-            ),
-            Tool(
-                name="guymager",
-                packages=["guymager"],
-                description="Forensic disk imaging solution",
-            ),
-            Tool(
-                name="xmount",
-                packages=["xmount"],
-                description="Convert on-disk images to virtual disk formats",
-            ),
-        ],
-    ),
-    "reverse": Category(
-        name="Reverse Engineering",
-        description="Binary and mobile application reverse engineering suites.",
-        tools=[
-            Tool(
-                name="ghidra",
-                packages=["ghidra"],
-                description="NSA's open-source reverse engineering toolkit",
-                auto_updates=False,
-            ),
-            Tool(
-                name="radare2",
-                packages=["radare2"],
-                description="Advanced command-line reverse engineering framework",
-            ),
-            Tool(
-                name="cutter",
-                packages=["cutter"],
-                description="Graphical interface for radare2",
-            ),
-            Tool(
-                name="jadx",
-                packages=["jadx"],
-                description="Android Dex to Java decompiler",
-            ),
-            Tool(
-                name="apktool",
-                packages=["apktool"],
-                description="Reverse engineer Android APK files",
+
+CATALOG_RESOURCE = "catalog.json"
+
+
+@functools.lru_cache(maxsize=None)
+def _load() -> Dict[str, Category]:
+    """Parse the bundled catalog data on first use."""
+
+    data = pkgutil.get_data(__package__, CATALOG_RESOURCE)
+    if data is None:  # pragma: no cover - loader without resource support
+        raise RuntimeError(f"Unable to load {CATALOG_RESOURCE}")
+    return {
+        key: Category(
+            name=entry["name"],
+            description=entry["description"],
+            tools=tuple(
+                Tool(
+                    name=tool["name"],
+                    packages=tuple(tool["packages"]),
+                    description=tool["description"],
+                    auto_updates=tool.get("auto_updates", True),
+                )
+                for tool in entry["tools"]
             ),
-        ],
-    ),
-}
+        )
+        for key, entry in json.loads(data).items()
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _catalog_lower() -> Mapping[str, Category]:
+    return MappingProxyType({key.casefold(): value for key, value in _load().items()})
+
+
+@functools.lru_cache(maxsize=None)
+def _available_categories() -> str:
+    return ", ".join(sorted(_load()))
+
+
+@functools.lru_cache(maxsize=None)
+def _package_index() -> Mapping[str, Tool]:
+    index: Dict[str, Tool] = {}
+    for category in _load().values():
+        for tool in category.tools:
+            for pkg in tool.packages:
+                index.setdefault(pkg, tool)
+    return MappingProxyType(index)
+
+
+@functools.lru_cache(maxsize=None)
+def _key_by_id() -> Mapping[int, str]:
+    return MappingProxyType({id(value): key for key, value in _load().items()})
+
+
+def __getattr__(name: str) -> Dict[str, Category]:
+    # CATALOG stays importable while being parsed lazily (PEP 562).
+    if name == "CATALOG":
+        return _load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def iter_categories() -> Iterable[Category]:
     """Iterate over the catalog categories."""
 
-    return CATALOG.values()
+    return _load().values()
 
 
+@functools.lru_cache(maxsize=128)
 def get_category(name: str) -> Category:
     """Return a category by its key, raising KeyError if not found."""
 
-    key = name.strip().lower()
-    if key not in CATALOG:
-        raise KeyError(f"Unknown category '{name}'. Available: {', '.join(sorted(CATALOG))}")
-    return CATALOG[key]
+    category = _catalog_lower().get(name.strip().casefold())
+    if category is None:
+        raise KeyError(f"Unknown category '{name}'. Available: {_available_categories()}")
+    return category
+
+
+def category_key(category: Category) -> str:
+    """Return the catalog key of *category*, raising ValueError if it is not in the catalog."""
+
+    try:
+        return _key_by_id()[id(category)]
+    except KeyError:
+        raise ValueError("Category not found in catalog") from None
+
+
+def tool_for_package(package: str) -> Optional[Tool]:
+    """Return the first catalog tool that provides *package*, if any."""
+
+    return _package_index().get(package)
+
+
+def packages_for(categories: Iterable[Category]) -> List[str]:
+    """Return the sorted union of packages provided by *categories*."""
+
+    categories = list(categories)
+    if len(categories) == 1:
+        return list(categories[0].installable_packages)
+    return sorted({pkg for category in categories for pkg in category.packages})
@@ -2,15 +2,14 @@
 from __future__ import annotations
 
 import argparse
-import json
-import shutil
+import functools
+import os
+import signal
 import sys
-import textwrap
-from typing import Iterable, List, Optional, Sequence
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
 
 from . import __version__
-from .apt import AptError, AptRunner, AptSourcesManager, get_installed_version, require_root
-from .catalog import Category, Tool, get_category, iter_categories
+from .catalog import Category, Tool, category_key, get_category, iter_categories, packages_for
 
 
 RESET = "\033[0m"
@@ -31,160 +30,289 @@ def colorize(text: str, tone: str, enabled: bool) -> str:
     return f"{tone}{text}{RESET}"
 
 
+# Escape codes per colour mode; renderers bind one pair up front and interpolate
+# tones directly instead of calling colorize() for every string.
+_ANSI = {
+    True: (PALETTE, RESET),
+    False: ({tone: "" for tone in PALETTE}, ""),
+}
+
+# Static border glyphs, coloured once per colour mode instead of on every line.
+_BORDERS = {
+    enabled: {"vbar": colorize("│", PALETTE["accent"], enabled)}
+    for enabled in (True, False)
+}
+
+
+_cached_width: Optional[int] = None
+_winch_handler: Optional[bool] = None
+
+
+def _invalidate_width(*_: object) -> None:
+    global _cached_width
+    _cached_width = None
+
+
+def _install_winch_handler() -> bool:
+    """Drop the cached width on terminal resize; return False if unsupported."""
+
+    if not hasattr(signal, "SIGWINCH"):
+        return False
+    try:
+        signal.signal(signal.SIGWINCH, _invalidate_width)
+    except ValueError:  # pragma: no cover - not called from the main thread
+        return False
+    return True
+
+
 def terminal_width() -> int:
     """Return the detected terminal width with sane fallbacks."""
 
-    return max(70, shutil.get_terminal_size((100, 24)).columns)
+    global _cached_width, _winch_handler
+    if _winch_handler is None:
+        _winch_handler = _install_winch_handler()
+    if _cached_width is not None:
+        return _cached_width
+    import shutil
+
+    width = max(70, shutil.get_terminal_size((100, 24)).columns)
+    # Without a resize notification a cached width could go stale.
+    if _winch_handler:
+        _cached_width = width
+    return width
 
 
 def wrap_text(text: str, width: int) -> List[str]:
-    """Wrap text without breaking long words unexpectedly."""
+    """Wrap text without breaking long words unexpectedly.
+
+    Runs of whitespace collapse to a single space, so this matches
+    ``textwrap.wrap(text, width, break_long_words=False,
+    break_on_hyphens=False)`` only for single-spaced text such as the
+    catalog descriptions.
+    """
 
     if not text:
         return [""]
-    return textwrap.wrap(text, width=width, break_long_words=False, break_on_hyphens=False)
+    # Greedy single pass over whitespace-separated words; words longer than
+    # *width* get a line of their own, as with textwrap's break_long_words=False.
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        if not current:
+            current = word
+        elif len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}"
+    if current:
+        lines.append(current)
+    return lines
 
 
-def render_banner(color_enabled: bool) -> None:
-    """Print a stylised banner for the CLI."""
+def emit(lines: List[str]) -> None:
+    """Write accumulated output lines to stdout in a single call."""
 
-    accent = PALETTE["accent"]
-    highlight = PALETTE["highlight"]
+    if not lines:
+        return
+    text = "\n".join(lines) + "\n"
+    stream = sys.stdout
+    if getattr(stream, "buffer", None) is None:
+        stream.write(text)
+        return
+    # Encode once and bypass TextIOWrapper's per-write encoding.
+    _write_bytes(text.encode(stream.encoding or "utf-8", stream.errors or "strict"))
+
+
+def _write_bytes(data: bytes) -> None:
+    """Write *data* straight to stdout's binary buffer."""
+
+    try:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); point stdout at devnull
+        # so the interpreter's final flush does not raise again.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+
+
+def _build_banner(color_enabled: bool) -> str:
     banner = [
         "╔═╗╔═╗╔╦╗╔═╗╔═╗╦  ╦╔═╗╦╔╦╗",
         "╠╣ ╠═╣ ║ ╠═╝║ ║║  ║║ ║║ ║ ",
         "╚  ╩ ╩ ╩ ╩  ╚═╝╩═╝╩╚═╝╩ ╩ ",
     ]
-    for line in banner:
-        print(colorize(line, accent, color_enabled))
+    lines = [colorize(line, PALETTE["accent"], color_enabled) for line in banner]
     tagline = "Curated Kali tooling for Ubuntu • respect to torjan0"
-    print(colorize(tagline, highlight, color_enabled))
+    lines.append(colorize(tagline, PALETTE["highlight"], color_enabled))
     legend = "Legend: ✅ installed • ⬡ not installed • ⚙️ auto updates • 🛠 manual updates"
-    print(colorize(legend, PALETTE["muted"], color_enabled))
+    lines.append(colorize(legend, PALETTE["muted"], color_enabled))
+    return "\n".join(lines)
+
+
+# The banner never changes, so both colour variants are composed at import.
+_BANNER = {enabled: _build_banner(enabled) for enabled in (True, False)}
+
+
+def render_banner(out: List[str], color_enabled: bool) -> None:
+    """Append a stylised banner for the CLI."""
 
+    out.append(_BANNER[color_enabled])
 
-def render_category_card(entry: dict, color_enabled: bool) -> None:
+
+class ToolRow(NamedTuple):
+    """Display record for one tool, shared by every renderer."""
+
+    name: str
+    packages: Tuple[str, ...]
+    description: str
+    updates: str
+    version: Optional[str]
+
+
+class CategoryRow(NamedTuple):
+    """Display record for one category and its tool rows."""
+
+    key: str
+    name: str
+    description: str
+    tools: Tuple[ToolRow, ...]
+
+
+def render_category_card(out: List[str], entry: CategoryRow, color_enabled: bool) -> None:
     """Render a single category with a bordered card layout."""
 
     width = min(terminal_width(), 110)
     inner_width = width - 2
-    accent = PALETTE["accent"]
+    # Resolve the colour mode once; the per-line helpers below never branch on it.
+    vbar = _BORDERS[color_enabled]["vbar"]
+    tones, reset = _ANSI[color_enabled]
 
-    top_border = "╭" + "─" * inner_width + "╮"
-    mid_border = "├" + "─" * inner_width + "┤"
-    bottom_border = "╰" + "─" * inner_width + "╯"
-    print(colorize(top_border, accent, color_enabled))
-    title = f" {entry['name']} [{entry['key']}] "
+    top_border, mid_border, bottom_border = _card_borders(inner_width, color_enabled)
+    out.append(top_border)
+    title = f" {entry.name} [{entry.key}] "
     title_line = title.center(inner_width)
-    print(colorize(f"│{title_line}│", accent, color_enabled))
-    print(colorize(mid_border, accent, color_enabled))
-
-    for line in wrap_text(entry["description"], inner_width - 2):
-        print(_box_line(f" {line}", inner_width, color_enabled))
-
-    print(_box_line("", inner_width, color_enabled))
-
-    for tool in entry["tools"]:
-        packages = ", ".join(tool["packages"])
-        status_icon = "✅" if tool["version"] else "⬡"
-        updates_icon = "⚙️" if tool["updates"] == "auto" else "🛠"
-        version_info = tool["version"] or "not installed"
-        updates_label = f"{updates_icon} {tool['updates']} updates"
-        header = f"{status_icon} {tool['name']} [{packages}]"
+    out.append(f"{tones['accent']}│{title_line}│{reset}")
+    out.append(mid_border)
+    blank_line = _box_line("", inner_width, vbar)
+
+    for line in wrap_text(entry.description, inner_width - 2):
+        out.append(_box_line(f" {line}", inner_width, vbar))
+
+    out.append(blank_line)
+
+    for tool in entry.tools:
+        packages = ", ".join(tool.packages)
+        status_icon = "✅" if tool.version else "⬡"
+        updates_icon = "⚙️" if tool.updates == "auto" else "🛠"
+        version_info = tool.version or "not installed"
+        updates_label = f"{updates_icon} {tool.updates} updates"
+        header = f"{status_icon} {tool.name} [{packages}]"
         for line in wrap_text(header, inner_width - 2):
-            print(_box_line(f" {line}", inner_width, color_enabled))
-        detail = f"↳ {tool['description']}"
+            out.append(_box_line(f" {line}", inner_width, vbar))
+        detail = f"↳ {tool.description}"
         for line in wrap_text(detail, inner_width - 2):
-            print(_box_line(f" {line}", inner_width, color_enabled))
+            out.append(_box_line(f" {line}", inner_width, vbar))
         status = f"↳ {version_info} • {updates_label}"
         for line in wrap_text(status, inner_width - 2):
-            print(_box_line(f" {line}", inner_width, color_enabled))
-        print(_box_line("", inner_width, color_enabled))
+            out.append(_box_line(f" {line}", inner_width, vbar))
+        out.append(blank_line)
+
+    out.append(bottom_border)
+
+
+@functools.lru_cache(maxsize=8)
+def _card_borders(inner_width: int, color_enabled: bool) -> Tuple[str, str, str]:
+    """Return the coloured top, middle and bottom card borders for *inner_width*."""
 
-    print(colorize(bottom_border, accent, color_enabled))
+    rule = "─" * inner_width
+    accent = PALETTE["accent"]
+    return (
+        colorize(f"╭{rule}╮", accent, color_enabled),
+        colorize(f"├{rule}┤", accent, color_enabled),
+        colorize(f"╰{rule}╯", accent, color_enabled),
+    )
 
 
-def _box_line(content: str, inner_width: int, color_enabled: bool) -> str:
-    """Return a formatted line with coloured vertical borders."""
+def _box_line(content: str, inner_width: int, vbar: str) -> str:
+    """Return *content* padded to *inner_width* between two *vbar* borders."""
 
-    padded = content.ljust(inner_width)
-    left = colorize("│", PALETTE["accent"], color_enabled)
-    right = colorize("│", PALETTE["accent"], color_enabled)
-    return f"{left}{padded}{right}"
+    pad = " " * (inner_width - len(content))
+    return f"{vbar}{content}{pad}{vbar}"
 
 
-def render_fancy_list(payload: List[dict], color_enabled: bool) -> None:
+def render_fancy_list(out: List[str], payload: List[CategoryRow], color_enabled: bool) -> None:
     """Render the category list with banners and cards."""
 
+    tones, reset = _ANSI[color_enabled]
     if not payload:
-        render_banner(color_enabled)
+        render_banner(out, color_enabled)
         warning = "No tools match the current filters."
-        print(colorize(warning, PALETTE["warning"], color_enabled))
+        out.append(f"{tones['warning']}{warning}{reset}")
         return
 
-    render_banner(color_enabled)
+    render_banner(out, color_enabled)
     total_categories = len(payload)
-    total_tools = sum(len(entry["tools"]) for entry in payload)
+    total_tools = sum(len(entry.tools) for entry in payload)
     summary = f"{total_categories} categories • {total_tools} curated tools"
-    print(colorize(summary, PALETTE["highlight"], color_enabled))
-    print()
+    out.append(f"{tones['highlight']}{summary}{reset}")
+    out.append("")
     for index, entry in enumerate(payload):
         if index:
-            print()
-        render_category_card(entry, color_enabled)
+            out.append("")
+        render_category_card(out, entry, color_enabled)
 
 
-def render_plain_list(payload: List[dict]) -> None:
+def render_plain_list(out: List[str], payload: List[CategoryRow]) -> None:
     """Render a simplified list output (legacy style)."""
 
     for entry in payload:
-        print(f"[{entry['key']}] {entry['name']} - {entry['description']}")
-        for tool in entry["tools"]:
-            version_info = tool["version"] or "not installed"
-            update_label = "automatic" if tool["updates"] == "auto" else "manual"
-            print(
-                f"  - {tool['name']} ({', '.join(tool['packages'])})"
-                f" :: {tool['description']} :: {version_info} :: {update_label} updates"
+        out.append(f"[{entry.key}] {entry.name} - {entry.description}")
+        for tool in entry.tools:
+            version_info = tool.version or "not installed"
+            update_label = "automatic" if tool.updates == "auto" else "manual"
+            out.append(
+                f"  - {tool.name} ({', '.join(tool.packages)})"
+                f" :: {tool.description} :: {version_info} :: {update_label} updates"
             )
 
 
-def render_versions_table(headers: Sequence[str], rows: List[Sequence[str]], color_enabled: bool) -> None:
+def render_versions_table(
+    out: List[str], headers: Sequence[str], rows: List[Sequence[str]], color_enabled: bool
+) -> None:
     """Render versions in a boxed table layout."""
 
-    accent = PALETTE["accent"]
-    widths = [len(header) for header in headers]
-    for row in rows:
-        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    tones, reset = _ANSI[color_enabled]
+    accent = tones["accent"]
+    border_piece = _BORDERS[color_enabled]["vbar"]
+    # One column-wise pass: transpose header + rows and take each column's widest cell.
+    widths = [max(map(len, column)) for column in zip(headers, *rows)]
 
     def border(left: str, fill: str, sep: str, right: str) -> str:
-        segments = [colorize(fill * (width + 2), accent, color_enabled) for width in widths]
-        left_col = colorize(left, accent, color_enabled)
-        right_col = colorize(right, accent, color_enabled)
-        sep_col = colorize(sep, accent, color_enabled)
-        return left_col + sep_col.join(segments) + right_col
+        # Build the whole rule as plain text so it needs a single colour span.
+        interior = sep.join(fill * (width + 2) for width in widths)
+        return f"{accent}{left}{interior}{right}{reset}"
 
     def row_line(cells: Sequence[str]) -> str:
-        parts = []
-        for cell, width in zip(cells, widths):
-            parts.append(f" {cell.ljust(width)} ")
-        border_piece = colorize("│", accent, color_enabled)
-        return border_piece + border_piece.join(parts) + border_piece
+        inner = border_piece.join(f" {cell:<{width}} " for cell, width in zip(cells, widths))
+        return "".join((border_piece, inner, border_piece))
 
     header_border = border("┏", "━", "┯", "┓")
     row_border = border("┠", "─", "┼", "┨")
     footer_border = border("┗", "━", "┷", "┛")
-    print(header_border)
+    out.append(header_border)
 
-    header_cells = [header.center(width) for header, width in zip(headers, widths)]
-    header_cells = [colorize(cell, PALETTE["highlight"], color_enabled) for cell in header_cells]
-    print(row_line(header_cells))
-    print(row_border)
+    highlight = tones["highlight"]
+    header_cells = [f"{highlight}{header.center(width)}{reset}" for header, width in zip(headers, widths)]
+    out.append(row_line(header_cells))
+    out.append(row_border)
 
     for row in rows:
-        padded = [cell.ljust(width) for cell, width in zip(row, widths)]
-        print(row_line(padded))
+        out.append(row_line(row))
 
-    print(footer_border)
+    out.append(footer_border)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -224,13 +352,18 @@ def build_parser() -> argparse.ArgumentParser:
         help="Disable the stylised renderer and use legacy text output",
     )
 
-    install_parser = subparsers.add_parser("install", help="Install all tools for a category")
-    install_parser.add_argument("category", help="Category key to install")
+    install_parser = subparsers.add_parser("install", help="Install all tools for one or more categories")
+    install_parser.add_argument("category", nargs="+", help="Category keys to install")
     install_parser.add_argument(
         "--upgrade",
         action="store_true",
         help="Attempt an in-place upgrade when tools are already installed",
     )
+    install_parser.add_argument(
+        "--parallel-download",
+        action="store_true",
+        help="Prefetch package archives in parallel with aria2c when it is installed",
+    )
 
     repo_parser = subparsers.add_parser("repo", help="Manage Kali repository sources")
     repo_sub = repo_parser.add_subparsers(dest="repo_command", required=True)
@@ -271,78 +404,88 @@ def list_categories(
     else:
         categories = iter_categories()
 
-    payload = []
-    for cat in categories:
-        tools_payload = []
-        for tool in cat.tools:
-            version = resolve_tool_version(tool)
-            if only_installed and version is None:
-                continue
-            tools_payload.append(
-                {
-                    "name": tool.name,
-                    "packages": tool.packages,
-                    "description": tool.description,
-                    "updates": tool.labels(),
-                    "version": version,
-                }
-            )
-        if only_installed and not tools_payload:
-            continue
-        payload.append(
-            {
-                "key": lookup_category_key(cat),
-                "name": cat.name,
-                "description": cat.description,
-                "tools": tools_payload,
-            }
-        )
+    payload = build_rows(categories, only_installed=only_installed)
 
     if as_json:
-        json.dump(payload, sys.stdout, indent=2)
-        sys.stdout.write("\n")
+        write_json(
+            [{**entry._asdict(), "tools": [tool._asdict() for tool in entry.tools]} for entry in payload]
+        )
     else:
+        out: List[str] = []
         if not payload:
             message = "No tools match the current filters."
             if fancy:
-                render_fancy_list([], color_enabled)
+                render_fancy_list(out, [], color_enabled)
             else:
-                print(message)
-            return 0
-        if fancy:
-            render_fancy_list(payload, color_enabled)
+                out.append(message)
+        elif fancy:
+            render_fancy_list(out, payload, color_enabled)
         else:
-            render_plain_list(payload)
+            render_plain_list(out, payload)
+        emit(out)
     return 0
 
 
-def lookup_category_key(category: Category) -> str:
-    for key, value in iter_categories_with_keys():
-        if value is category:
-            return key
-    raise ValueError("Category not found in catalog")
+def build_rows(categories: Iterable[Category], *, only_installed: bool = False) -> List[CategoryRow]:
+    """Resolve installed versions once and build display rows for *categories*."""
 
+    from .apt import get_installed_versions
 
-def iter_categories_with_keys():
-    from .catalog import CATALOG
+    categories = list(categories)
+    versions = get_installed_versions(packages_for(categories))
+
+    rows = []
+    for cat in categories:
+        tools = [
+            ToolRow(
+                name=tool.name,
+                packages=tool.packages,
+                description=tool.description,
+                updates=tool.labels(),
+                version=resolve_tool_version(tool, versions),
+            )
+            for tool in cat.tools
+        ]
+        if only_installed:
+            tools = [tool for tool in tools if tool.version is not None]
+            if not tools:
+                continue
+        rows.append(CategoryRow(category_key(cat), cat.name, cat.description, tuple(tools)))
+    return rows
 
-    return CATALOG.items()
 
+def write_json(payload: object) -> None:
+    """Write *payload* as indented JSON, using orjson when it is installed."""
+
+    try:
+        import orjson
+    except ImportError:
+        import json
 
-def resolve_tool_version(tool: Tool) -> Optional[str]:
+        emit([json.dumps(payload, indent=2)])
+        return
+    _write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2) + b"\n")
+
+
+def resolve_tool_version(tool: Tool, installed: Mapping[str, Optional[str]]) -> Optional[str]:
     versions: List[str] = []
     for package in tool.packages:
-        version = get_installed_version(package)
-        if version:
+        version = installed.get(package)
+        # Tools ship at most a handful of packages, so a list scan beats a set.
+        if version and version not in versions:
             versions.append(version)
     if not versions:
         return None
-    return ", ".join(sorted(set(versions)))
+    return ", ".join(sorted(versions))
+
 
+def handle_install(
+    category_keys: Sequence[str], *, upgrade: bool, dry_run: bool, parallel_download: bool = False
+) -> int:
+    from .apt import AptError, AptRunner, AptSourcesManager, get_installed_versions, require_root
 
-def handle_install(category_key: str, *, upgrade: bool, dry_run: bool) -> int:
     try:
-        category = get_category(category_key)
+        categories = [get_category(key) for key in category_keys]
     except KeyError as exc:
         print(str(exc), file=sys.stderr)
         return 1
@@ -359,22 +502,18 @@ def handle_install(category_key: str, *, upgrade: bool, dry_run: bool) -> int:
         print(exc, file=sys.stderr)
         return 1
 
-    packages = sorted({pkg for tool in category.tools for pkg in tool.packages})
-    versions_before = {pkg: get_installed_version(pkg) for pkg in packages}
+    packages = packages_for(categories)
+    versions_before = get_installed_versions(packages)
 
     runner.ensure_updated()
-    if upgrade:
-        runner.upgrade_packages(packages)
-    else:
-        runner.install_packages(packages)
+    runner.install_many(packages, upgrade=upgrade, parallel_download=parallel_download)
 
-    for tool in category.tools:
-        version = resolve_tool_version(tool)
+    versions_after = get_installed_versions(packages)
+    tools = {tool.name: tool for category in categories for tool in category.tools}
+    for tool in tools.values():
+        version = resolve_tool_version(tool, versions_after)
         upgrade_label = "automatic" if tool.auto_updates else "manual"
-        prev_versions = {versions_before[pkg] for pkg in tool.packages}
-        if None in prev_versions:
-            prev_versions.discard(None)
-        prev_display = ", ".join(sorted(prev_versions)) or "not installed"
+        prev_display = resolve_tool_version(tool, versions_before) or "not installed"
         print(
             f"{tool.name}: {prev_display} -> {version or 'not installed'} ({upgrade_label} updates)"
         )
@@ -382,6 +521,8 @@ def handle_install(category_key: str, *, upgrade: bool, dry_run: bool) -> int:
 
 
 def handle_repo(command: str, *, toggle_disable: bool, dry_run: bool) -> int:
+    from .apt import AptError, AptRunner, AptSourcesManager, require_root
+
     runner = AptRunner(dry_run=dry_run)
     sources = AptSourcesManager(runner=runner)
 
@@ -419,31 +560,34 @@ def handle_versions(
     else:
         categories = iter_categories()
 
-    categories = list(categories)
-
-    rows: List[Sequence[str]] = []
-    plain_payload = []
-    for cat in categories:
-        key = lookup_category_key(cat)
-        tools_payload = []
-        for tool in cat.tools:
-            version = resolve_tool_version(tool) or "not installed"
-            update_policy = "automatic" if tool.auto_updates else "manual"
-            rows.append((key, tool.name, version, update_policy))
-            tools_payload.append((tool.name, version, update_policy))
-        plain_payload.append((key, cat.name, tools_payload))
+    payload = build_rows(categories)
 
+    out: List[str] = []
     if fancy:
+        rows = [
+            (
+                entry.key,
+                tool.name,
+                tool.version or "not installed",
+                "automatic" if tool.updates == "auto" else "manual",
+            )
+            for entry in payload
+            for tool in entry.tools
+        ]
         if rows:
-            render_versions_table(("Category", "Tool", "Version", "Updates"), rows, color_enabled)
+            render_versions_table(out, ("Category", "Tool", "Version", "Updates"), rows, color_enabled)
         else:
+            tones, reset = _ANSI[color_enabled]
             warning = "No tools available for the requested category."
-            print(colorize(warning, PALETTE["warning"], color_enabled))
+            out.append(f"{tones['warning']}{warning}{reset}")
     else:
-        for key, name, tools in plain_payload:
-            print(f"[{key}] {name}")
-            for tool_name, version, update_policy in tools:
-                print(f"  - {tool_name}: {version} ({update_policy} updates)")
+        for entry in payload:
+            out.append(f"[{entry.key}] {entry.name}")
+            for tool in entry.tools:
+                version = tool.version or "not installed"
+                update_policy = "automatic" if tool.updates == "auto" else "manual"
+                out.append(f"  - {tool.name}: {version} ({update_policy} updates)")
+    emit(out)
     return 0
 
 
@@ -461,7 +605,12 @@ def main(argv: Optional[List[str]] = None) -> int:
             color_enabled=color_enabled,
         )
     if args.command == "install":
-        return handle_install(args.category, upgrade=args.upgrade, dry_run=args.dry_run)
+        return handle_install(
+            args.category,
+            upgrade=args.upgrade,
+            dry_run=args.dry_run,
+            parallel_download=args.parallel_download,
+        )
     if args.command == "repo":
         if args.repo_command == "enable":
             return handle_repo("enable", toggle_disable=args.disable, dry_run=args.dry_run)